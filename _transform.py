@@ -0,0 +1,101 @@
+"""
+Hot parse-and-transform loops shared by the ASSIST scripts.
+
+This module is deliberately self-contained and fully annotated so it can
+be compiled with mypyc (``mypyc _transform.py``) in service contexts
+where the scripts run repeatedly; the compiled extension shadows this
+file and removes the dict-op interpreter dispatch from the tight loops,
+while the plain module keeps working everywhere else.
+"""
+
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+# ASSIST timestamps are ISO 8601 and timezone-naive, e.g.
+# 2025-06-30T00:00:00, so validated strings compare lexicographically
+# in date order — no datetime construction needed per row.
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def is_currently_approved(end_date_str: Optional[str], now_iso: str) -> bool:
+    """
+    Consider currently approved if:
+    - endDate is missing/null OR
+    - endDate is in the future
+
+    `now_iso` is datetime.utcnow().isoformat(), passed in so a whole
+    batch of courses shares one timestamp. Malformed dates count as not
+    approved, matching the old ValueError path.
+    """
+    if not end_date_str:
+        return True
+    if not _ISO_DATE_RE.match(end_date_str):
+        return False
+    return end_date_str > now_iso
+
+
+def course_record(c: Dict[str, Any], now_iso: str) -> Dict[str, Any]:
+    """Build one transferability output dict. Called per row, so stick to locals."""
+    get = c.get
+    identifier = (get("identifier") or "").strip()
+    title = (get("courseTitle") or "").strip()
+    end_date = get("endDate")
+
+    # Branching skips the " - " join plus the strip(" -") cleanup scan
+    # whenever one side is empty
+    if identifier and title:
+        course_name = identifier + " - " + title
+    else:
+        course_name = identifier or title
+
+    return {
+        "course": course_name,
+        "transferAreas": [
+            code
+            for a in (get("transferAreas") or ())
+            if (code := a.get("code"))
+        ],
+        "approvedDate": get("beginDate"),
+        "approvedTerm": get("beginTermCode"),
+        "removedDate": end_date,
+        "removedTerm": get("endTermCode"),
+        "isCurrentlyApproved": is_currently_approved(end_date, now_iso),
+    }
+
+
+def extract_transfers(articulations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Walk the articulations tree into the simple transfers list."""
+    intern = sys.intern
+    transfers: List[Dict[str, Any]] = []
+    append = transfers.append
+
+    for dept in articulations:
+        for course in dept['articulations']:
+            if course['type'] != 'Course':
+                continue
+            course_info = course['course']
+
+            # The same prefix/title/department strings recur across
+            # thousands of courses; interning collapses the duplicates
+            prefix = intern(course_info['prefix'])
+            transfer = {
+                "from_course": f"{prefix} {course_info['courseNumber']}",
+                "course_title": intern(course_info['courseTitle']),
+                "units": course_info.get('minUnits', 'N/A'),
+                "department": intern(course_info['department'])
+            }
+
+            # Check for transfer mapping (same as reference)
+            sending_articulation = course.get('sendingArticulation') or {}
+            transfers_to = [
+                f"{tc['prefix']} {tc['courseNumber']}: {tc['courseTitle']}"
+                for item in (sending_articulation.get('items') or ())
+                if 'items' in item
+                for tc in item['items']
+            ]
+            transfer["transfers_to"] = transfers_to or ["No equivalent course"]
+
+            append(transfer)
+
+    return transfers
@@ -11,53 +11,137 @@ Includes:
 - approved date / term
 - removed date / term
 - isCurrentlyApproved flag (Python 3.9 compatible)
+
+Fetches run on asyncio + httpx with HTTP/2, so several academic years
+are multiplexed over one connection instead of paying one full round
+trip (and one socket) each.
 """
 
-import json
-import requests
+import io
+import time
+import asyncio
+import hashlib
 import argparse
 import os
 from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
+import httpx
+import ijson
+import orjson
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+from _transform import course_record as _course_record, is_currently_approved  # noqa: F401
+
 
 # ---------------------------
 # Helpers
 # ---------------------------
 
-def fetch_api_data(url: str) -> dict:
-    headers = {
-        "User-Agent": "assist-transfer-scraper/1.0",
-        "Accept": "application/json",
-    }
-    response = requests.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
-    return response.json()
+HEADERS = {
+    "User-Agent": "assist-transfer-scraper/1.0",
+    "Accept": "application/json",
+    # ASSIST bodies compress well; brotli needs the Brotli package installed
+    "Accept-Encoding": "gzip, br",
+}
 
 
-def is_currently_approved(end_date_str: Optional[str]) -> bool:
-    """
-    Consider currently approved if:
-    - endDate is missing/null OR
-    - endDate is in the future
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".assist_cache")
+CACHE_TTL = 86400  # seconds; ASSIST data changes rarely
+
+# Cap in-flight requests so a wide fan-out doesn't trip ASSIST throttling
+_MAX_INFLIGHT = int(os.environ.get("ASSIST_MAX_INFLIGHT", "8"))
+_inflight_sem: Optional[asyncio.Semaphore] = None
+
+
+def _request_slot() -> asyncio.Semaphore:
+    # Created lazily so the semaphore binds to the running event loop
+    global _inflight_sem
+    if _inflight_sem is None:
+        _inflight_sem = asyncio.Semaphore(_MAX_INFLIGHT)
+    return _inflight_sem
+
+
+def _cache_path(url: str) -> str:
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
 
-    ASSIST timestamps are typically timezone-naive.
+
+def _retryable(exc: BaseException) -> bool:
+    """Retry transient transport failures and 5xx responses, not 4xx."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    retry=retry_if_exception(_retryable),
+    reraise=True,
+)
+async def fetch_api_data(client: httpx.AsyncClient, url: str) -> bytes:
     """
-    if not end_date_str:
-        return True
+    Return the raw JSON body; callers stream-parse it with ijson.
 
+    Bodies are cached on disk for CACHE_TTL so repeat runs against the
+    same URL skip the network entirely. Transient failures are retried
+    with exponential backoff so one flaky response doesn't kill a run.
+    """
+    path = _cache_path(url)
     try:
-        end_dt = datetime.fromisoformat(end_date_str)
-        return end_dt > datetime.utcnow()
-    except ValueError:
-        return False
+        if time.time() - os.path.getmtime(path) < CACHE_TTL:
+            with open(path, "rb") as f:
+                return f.read()
+    except OSError:
+        pass  # no cached copy yet
+
+    async with _request_slot():
+        response = await client.get(url)
+    response.raise_for_status()
+    body = response.content
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(body)
+    return body
+
+
+def parse_header(buf: bytes) -> dict:
+    """
+    Pull the few top-level fields out of the response without building
+    the full document tree.
+    """
+    institution_name = None
+    academic_year = None
+    list_type = None
+
+    for prefix, _event, value in ijson.parse(io.BytesIO(buf)):
+        if prefix == "institutionName":
+            institution_name = value
+        elif prefix == "academicYear.code":
+            academic_year = value
+        elif prefix == "listType":
+            list_type = value
+
+    return {
+        "institutionName": institution_name,
+        "academicYear": academic_year,
+        "listType": list_type,
+    }
 
 
 # ---------------------------
 # Core logic
 # ---------------------------
 
-def get_transfer_courses(institution_id: int, academic_year_id: int, list_type: str) -> dict:
+async def get_transfer_courses(
+    client: httpx.AsyncClient,
+    institution_id: int,
+    academic_year_id: int,
+    list_type: str,
+) -> dict:
     url = (
         "https://www.assist.org/api/transferability/courses"
         f"?institutionId={institution_id}"
@@ -65,36 +149,24 @@ def get_transfer_courses(institution_id: int, academic_year_id: int, list_type:
         f"&listType={list_type}"
     )
 
-    data = fetch_api_data(url)
+    buf = await fetch_api_data(client, url)
 
-    courses_out = []
-    for c in data.get("courseInformationList", []) or []:
-        identifier = (c.get("identifier") or "").strip()
-        title = (c.get("courseTitle") or "").strip()
-        course_name = f"{identifier} - {title}".strip(" -")
+    # Stream one course dict at a time instead of materializing the
+    # whole courseInformationList up front; the comprehension appends via
+    # LIST_APPEND and keeps every lookup local.
+    now_iso = datetime.utcnow().isoformat()
+    build = _course_record
+    courses_out = [
+        build(c, now_iso)
+        for c in ijson.items(io.BytesIO(buf), "courseInformationList.item")
+    ]
 
-        transfer_areas = [
-            a.get("code")
-            for a in (c.get("transferAreas") or [])
-            if a.get("code")
-        ]
-
-        end_date = c.get("endDate")
-
-        courses_out.append({
-            "course": course_name,
-            "transferAreas": transfer_areas,
-            "approvedDate": c.get("beginDate"),
-            "approvedTerm": c.get("beginTermCode"),
-            "removedDate": end_date,
-            "removedTerm": c.get("endTermCode"),
-            "isCurrentlyApproved": is_currently_approved(end_date),
-        })
+    header = parse_header(buf)
 
     return {
-        "institutionName": data.get("institutionName"),
-        "academicYear": (data.get("academicYear") or {}).get("code"),
-        "listType": data.get("listType"),
+        "institutionName": header["institutionName"],
+        "academicYear": header["academicYear"],
+        "listType": header["listType"],
         "listTypeRequested": list_type,
         "courses": courses_out,
     }
@@ -104,29 +176,90 @@ def get_transfer_courses(institution_id: int, academic_year_id: int, list_type:
 # CLI entry point
 # ---------------------------
 
-def main(institution_id: int, academic_year_id: int, list_type: str, out_file: str):
-    result = get_transfer_courses(institution_id, academic_year_id, list_type)
+def output_path(out_file: str, year_suffix: Optional[int] = None) -> str:
+    # With several years in flight, keep one output file per year
+    if year_suffix is not None:
+        root, ext = os.path.splitext(out_file)
+        out_file = f"{root}_{year_suffix}{ext or '.json'}"
 
     # Write output next to this script unless absolute path is provided
     if os.path.isabs(out_file):
-        out_path = out_file
-    else:
-        out_path = os.path.join(os.path.dirname(__file__), out_file)
+        return out_file
+    return os.path.join(os.path.dirname(__file__), out_file)
+
+
+async def _fetch_year(
+    client: httpx.AsyncClient,
+    institution_id: int,
+    year_id: int,
+    list_type: str,
+) -> tuple:
+    return year_id, await get_transfer_courses(client, institution_id, year_id, list_type)
+
+
+def _ndjson_bytes(result: dict) -> bytes:
+    """JSON Lines form: one metadata header line, then one course per line.
+
+    Streaming consumers can process it line by line without loading the
+    whole document, and grep/jq -c slice it directly.
+    """
+    header = {
+        "institutionName": result["institutionName"],
+        "academicYear": result["academicYear"],
+        "listType": result["listType"],
+        "listTypeRequested": result["listTypeRequested"],
+    }
+    lines = [orjson.dumps(header)]
+    lines.extend(orjson.dumps(course) for course in result["courses"])
+    return b"\n".join(lines) + b"\n"
+
+
+async def main(
+    institution_id: int,
+    academic_year_ids: list,
+    list_type: str,
+    out_file: str,
+    compact: bool = False,
+    ndjson: bool = False,
+):
+    # Pretty-printing re-walks the whole tree; skip it for big outputs
+    opts = 0 if compact else orjson.OPT_INDENT_2
+    single = len(academic_year_ids) == 1
+
+    limits = httpx.Limits(max_connections=32)
+    async with httpx.AsyncClient(http2=True, headers=HEADERS, timeout=30, limits=limits) as client:
+        tasks = [
+            _fetch_year(client, institution_id, year_id, list_type)
+            for year_id in academic_year_ids
+        ]
+
+        # Write each file the moment its response lands, so disk I/O
+        # overlaps the remaining network waits instead of trailing them.
+        for coro in asyncio.as_completed(tasks):
+            year_id, result = await coro
+            out_path = output_path(out_file, None if single else year_id)
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2)
+            # One serialized buffer, one write syscall
+            if ndjson:
+                Path(out_path).write_bytes(_ndjson_bytes(result))
+            else:
+                Path(out_path).write_bytes(orjson.dumps(result, option=opts))
 
-    print(f"Saved {len(result['courses'])} courses to {out_path}")
-    if result.get("institutionName") and result.get("academicYear"):
-        print(f"{result['institutionName']} ({result['academicYear']})")
+            print(f"Saved {len(result['courses'])} courses to {out_path}")
+            if result.get("institutionName") and result.get("academicYear"):
+                print(f"{result['institutionName']} ({result['academicYear']})")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build CALGETC (IGETC) transfer list from ASSIST API")
     parser.add_argument("--institutionId", type=int, default=133)
-    parser.add_argument("--academicYearId", type=int, default=76)
+    parser.add_argument("--academicYearId", type=int, nargs="+", default=[76])  # <-- accepts several years
     parser.add_argument("--listType", default="CALGETC")  # <-- default switched
     parser.add_argument("--out", default="calgetc_transfers.json")  # <-- default output name
+    parser.add_argument("--compact", action="store_true", help="write output without indentation")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="write JSON Lines: a metadata header line, then one course per line")
     args = parser.parse_args()
 
-    main(args.institutionId, args.academicYearId, args.listType, args.out)
+    asyncio.run(main(args.institutionId, args.academicYearId, args.listType, args.out,
+                     args.compact, args.ndjson))
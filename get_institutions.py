@@ -1,12 +1,46 @@
+import os
+import orjson
 import requests
-import json
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 URL = "https://www.assist.org/api/institutions"
 
-def main():
-    response = requests.get(URL)
+# One keep-alive session per process so repeated ASSIST calls reuse the
+# same TCP + TLS connection instead of handshaking every time. Responses
+# are cached on disk for a day (ASSIST data changes rarely), so repeat
+# runs skip the network entirely.
+_SESSION = CachedSession(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".assist_cache"),
+    backend="sqlite",
+    expire_after=86400,
+    cache_control=True,
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+# ASSIST bodies compress well; brotli needs the Brotli package installed
+_SESSION.headers["Accept-Encoding"] = "gzip, br"
+
+def _retryable(exc):
+    """Retry transient transport failures and 5xx responses, not 4xx."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    retry=retry_if_exception(_retryable),
+    reraise=True,
+)
+def fetch_institutions():
+    response = _SESSION.get(URL)
     response.raise_for_status()
-    institutions = response.json()
+    return orjson.loads(response.content)
+
+def main():
+    institutions = fetch_institutions()
 
     parsed = [
         {
@@ -16,8 +50,8 @@ def main():
         for inst in institutions
     ]
 
-    with open("school_codes.txt", "w", encoding="utf-8") as f:
-        json.dump(parsed, f, indent=2)
+    # One serialized buffer, one write syscall
+    Path("school_codes.txt").write_bytes(orjson.dumps(parsed, option=orjson.OPT_INDENT_2))
 
     print(f"Wrote {len(parsed)} schools to school_codes.txt")
 
@@ -3,88 +3,129 @@
 Make simple transfer list from ASSIST API data
 """
 
-import json
+import orjson
 import requests
 import argparse
 import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
+from _transform import extract_transfers
+
+# One keep-alive session per process so repeated ASSIST calls reuse the
+# same TCP + TLS connection instead of handshaking every time. Responses
+# are cached on disk for a day (ASSIST data changes rarely), so repeat
+# runs skip the network entirely.
+_SESSION = CachedSession(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".assist_cache"),
+    backend="sqlite",
+    expire_after=86400,
+    cache_control=True,
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+# ASSIST bodies compress well; brotli needs the Brotli package installed
+_SESSION.headers["Accept-Encoding"] = "gzip, br"
+
+def _retryable(exc):
+    """Retry transient transport failures and 5xx responses, not 4xx."""
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    retry=retry_if_exception(_retryable),
+    reraise=True,
+)
 def fetch_api_data(url):
-    """Fetch data from ASSIST API"""
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data: {e}")
-        return None
+    """Fetch data from ASSIST API, retrying transient failures.
+
+    Raises requests.RequestException once retries are exhausted instead
+    of silently returning None, so a broken run fails loudly.
+    """
+    response = _SESSION.get(url)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+def _as_obj(value):
+    """Decode a result field only when it is still a JSON-encoded string.
+
+    ASSIST has served these Agreements fields both ways; when they arrive
+    already parsed there is no reason to pay for a second decode.
+    """
+    if isinstance(value, (str, bytes)):
+        return orjson.loads(value)
+    return value
 
 def get_transfer_data(from_code, to_code):
     """Get transfer data and return as JSON object"""
     # Build API URL using the provided arguments
     api_url = f"https://assist.org/api/articulation/Agreements?Key=75/{from_code}/to/{to_code}/AllPrefixes"
     raw_data = fetch_api_data(api_url)
-    
+
     if not raw_data:
         return None
-    
+
     result = raw_data['result']
-    
+
     # Parse institutions
-    receiving = json.loads(result['receivingInstitution'])
-    sending = json.loads(result['sendingInstitution'])
-    academic_year = json.loads(result['academicYear'])
-    articulations = json.loads(result['articulations'])
+    receiving = _as_obj(result['receivingInstitution'])
+    sending = _as_obj(result['sendingInstitution'])
+    academic_year = _as_obj(result['academicYear'])
+    articulations = _as_obj(result['articulations'])
     
-    # Create simple structure (matching reference format)
+    # Create simple structure (matching reference format); the hot
+    # articulations walk lives in _transform so it can be mypyc-compiled
     simple_data = {
         "from_college": sending['names'][0]['name'],
         "to_college": receiving['names'][0]['name'],
         "academic_year": academic_year['code'],
-        "transfers": []
+        "transfers": extract_transfers(articulations)
     }
-    
-    # Extract transfers (matching reference format)
-    for dept in articulations:
-        for course in dept['articulations']:
-            if course['type'] == 'Course':
-                course_info = course['course']
-                
-                transfer = {
-                    "from_course": f"{course_info['prefix']} {course_info['courseNumber']}",
-                    "course_title": course_info['courseTitle'],
-                    "units": course_info.get('minUnits', 'N/A'),
-                    "department": course_info['department']
-                }
-                
-                # Check for transfer mapping (same as reference)
-                if course.get('sendingArticulation') and course['sendingArticulation'].get('items'):
-                    transfers_to = []
-                    for item in course['sendingArticulation']['items']:
-                        if 'items' in item:
-                            for to_course in item['items']:
-                                transfers_to.append(f"{to_course['prefix']} {to_course['courseNumber']}: {to_course['courseTitle']}")
-                    transfer["transfers_to"] = transfers_to if transfers_to else ["No equivalent course"]
-                else:
-                    transfer["transfers_to"] = ["No equivalent course"]
-                
-                simple_data["transfers"].append(transfer)
-    
+
     return simple_data
 
-def main(from_code, to_code):
+def get_transfer_data_many(pairs, max_workers=16):
+    """Fetch transfer data for many (from_code, to_code) pairs concurrently.
+
+    The work is I/O-bound on ASSIST responses, so a thread pool overlaps
+    the network waits; threads share the pooled session above. Returns a
+    dict mapping each (from_code, to_code) pair to its transfer data (or
+    None on failure).
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(get_transfer_data, from_code, to_code): (from_code, to_code)
+            for from_code, to_code in pairs
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except requests.RequestException:
+                results[futures[future]] = None
+    return results
+
+def main(from_code, to_code, compact=False):
     """Main function for command line usage"""
     transfer_data = get_transfer_data(from_code, to_code)
-    
+
     if not transfer_data:
         print("Failed to fetch data from API")
         return
-    
+
     # Save to file in same directory as script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     json_path = os.path.join(script_dir, 'simple_transfers.json')
-    
-    with open(json_path, 'w') as f:
-        json.dump(transfer_data, f, indent=2)
+
+    # Pretty-printing re-walks the whole tree; skip it for big outputs
+    opts = 0 if compact else orjson.OPT_INDENT_2
+    # One serialized buffer, one write syscall
+    Path(json_path).write_bytes(orjson.dumps(transfer_data, option=opts))
     
     print(f"Created simple_transfers.json with {len(transfer_data['transfers'])} courses")
     print(f"{transfer_data['from_college']} → {transfer_data['to_college']}")
@@ -102,5 +143,6 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Build transfer list from ASSIST API")
     parser.add_argument("from_code", help="Sending institution code")
     parser.add_argument("to_code", help="Receiving institution code")
+    parser.add_argument("--compact", action="store_true", help="write output without indentation")
     args = parser.parse_args()
-    main(args.from_code, args.to_code)
+    main(args.from_code, args.to_code, args.compact)